@@ -19,6 +19,11 @@ for _, lang_iso, is_lang in pkgutil.iter_modules(spacy.lang.__path__):
         valid_langs.append(lang_iso)
 logger.info("valid_langs=" + str(valid_langs))
 
+# the list above is kept for ordered iteration and reporting,
+# but lemmatize tests membership on every call,
+# so we also build a frozenset once for O(1) lookups instead of scanning the list
+valid_langs_set = frozenset(valid_langs)
+
 # the korean list of stop words isn't big enough,
 # so we add some more stop words here
 import spacy.lang.ko
@@ -77,14 +82,224 @@ def load_all_langs(langs=None):
     if langs is None:
         langs = valid_langs
 
-    for lang in langs:
-        nlp[lang] = load_lang(lang)
-
+    # the loads are independent of each other,
+    # and much of the load time is spent in file IO and in C code that releases the GIL,
+    # so loading the models in a thread pool overlaps their load times
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor() as executor:
+        for lang, model in zip(langs, executor.map(load_lang, langs)):
+            nlp[lang] = model
+
+
+# loaded spacy models can take up hundreds of megabytes of memory each,
+# so we store them in an LRU cache;
+# by default the cache is unbounded (just like an ordinary dict),
+# but calling set_maxitems lets memory constrained deployments
+# bound the number of models held in memory at once
+#
+# the _thread module gives us the raw C lock,
+# which is cheaper to acquire/release than the threading.Lock wrapper
+import _thread
+from collections import namedtuple
+from itertools import islice
+
+# mirrors the statistics interface of functools.lru_cache,
+# so that callers can tune maxitems/maxbytes from observed hit rates
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'currsize', 'maxsize'])
+
+
+class LRUCache:
+    '''
+    A simple least-recently-used cache.
+    Setting or getting a key marks it as the most recently used,
+    and whenever the cache grows beyond maxitems entries
+    (or the values grow beyond maxbytes total bytes),
+    the least recently used entries are evicted.
+
+    NOTE:
+    value sizes are measured with sys.getsizeof,
+    which only measures the shallow size of a value;
+    for container values the true memory usage will be undercounted,
+    so maxbytes should be treated as an approximate bound.
+
+    >>> cache = LRUCache(maxitems=2)
+    >>> cache['a'] = 1
+    >>> cache['b'] = 2
+    >>> cache['c'] = 3
+    >>> 'a' in cache
+    False
+    >>> 'b' in cache and 'c' in cache
+    True
+    '''
 
-# the nlp dictionary will hold the loaded spacy models,
-# and entry of None indicates that the model still needs to be loaded
-from collections import defaultdict
-nlp = defaultdict(lambda: None)
+    # __slots__ removes the per-instance __dict__,
+    # which shrinks each instance and makes attribute access a fixed-offset read
+    # instead of a dict lookup on the hot __getitem__/__setitem__ paths
+    __slots__ = ('cache', 'maxitems', 'maxbytes', 'keys', 'values', 'items', '_sizes', '_bytes', '_hits', '_misses', '_lock')
+
+    def __init__(self, maxitems=None, maxbytes=None):
+        # a plain dict preserves insertion order (guaranteed since python 3.7),
+        # and we use the insertion order to track how recently keys were used;
+        # compared to OrderedDict, a plain dict is faster
+        # and does not pay for the extra linked list nodes
+        self.cache = {}
+        self.maxitems = maxitems
+        self.maxbytes = maxbytes
+        # the iteration helpers are bound directly to the underlying dict's methods,
+        # so calling them skips a python-level wrapper frame;
+        # they yield entries in recency order, least recently used first
+        self.keys = self.cache.keys
+        self.values = self.cache.values
+        self.items = self.cache.items
+        # the per-key sizes are stored in a parallel dict
+        # so that evictions can decrement the running byte total
+        # without remeasuring the evicted value
+        self._sizes = {}
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        # every operation below mutates the cache
+        # (even lookups, since a lookup reorders the keys),
+        # so they all hold this lock to stay safe under concurrent callers;
+        # note that the lock is not reentrant,
+        # which is why _trim never acquires it itself
+        self._lock = _thread.allocate_lock()
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            # deleting an existing key before the assignment
+            # ensures the key is reinserted in the most recently used position
+            cache = self.cache
+            if key in cache:
+                del cache[key]
+                if self.maxbytes is not None:
+                    self._bytes -= self._sizes.pop(key)
+            cache[key] = value
+            if self.maxbytes is not None:
+                size = sys.getsizeof(value)
+                self._sizes[key] = size
+                self._bytes += size
+            if (self.maxitems is not None and len(cache) > self.maxitems) or (self.maxbytes is not None and self._bytes > self.maxbytes):
+                self._trim()
+
+    def __getitem__(self, key):
+        # pop+reinsert moves the key to the most recently used position;
+        # the counters are plain int increments,
+        # negligible next to the dict operations already happening here
+        with self._lock:
+            cache = self.cache
+            try:
+                value = cache.pop(key)
+            except KeyError:
+                self._misses += 1
+                raise
+            cache[key] = value
+            self._hits += 1
+            return value
+
+    def update(self, items):
+        # bulk insert with a single trim at the end;
+        # this lets dict.update run at C speed instead of paying the
+        # per-key trim check and lock round trip of repeated __setitem__ calls;
+        # note that unlike __setitem__,
+        # keys that already exist keep their old recency position
+        items = dict(items)
+        with self._lock:
+            self.cache.update(items)
+            if self.maxbytes is not None:
+                sizes = self._sizes
+                bytes_ = self._bytes
+                for key, value in items.items():
+                    size = sys.getsizeof(value)
+                    bytes_ += size - sizes.get(key, 0)
+                    sizes[key] = size
+                self._bytes = bytes_
+            self._trim()
+
+    def get(self, key, default=None):
+        # a single try/except avoids hashing the key twice,
+        # which is what a __contains__ check followed by __getitem__ would do
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return key in self.cache
+
+    def __len__(self):
+        return len(self.cache)
+
+    def __iter__(self):
+        # iter() looks dunder methods up on the type rather than the instance,
+        # so unlike keys/values/items this one cannot be an instance-level binding
+        return iter(self.cache)
+
+    def __eq__(self, other):
+        # comparing the underlying dicts runs entirely in C;
+        # like ordinary dict equality, the comparison ignores recency order
+        return self.cache == (other.cache if isinstance(other, LRUCache) else other)
+
+    # the cache is mutable, so it must not be hashable
+    __hash__ = None
+
+    def cache_info(self):
+        return CacheInfo(self._hits, self._misses, len(self.cache), self.maxitems)
+
+    def set_maxitems(self, maxitems):
+        with self._lock:
+            self.maxitems = maxitems
+            self._trim()
+
+    def set_maxbytes(self, maxbytes):
+        with self._lock:
+            self.maxbytes = maxbytes
+            # entries inserted while maxbytes was unset have no recorded size,
+            # so we measure them now before trimming
+            if maxbytes is not None:
+                for key, value in self.cache.items():
+                    if key not in self._sizes:
+                        size = sys.getsizeof(value)
+                        self._sizes[key] = size
+                        self._bytes += size
+            self._trim()
+
+    def _trim(self):
+        # an explicit is-None test is both faster than the truthiness protocol
+        # and treats a bound of 0 as "evict everything" rather than "unbounded";
+        # the bounds and the cache are bound to locals
+        # so the eviction loops do not redo the attribute lookups every iteration
+        #
+        # the oldest keys come first when iterating the cache,
+        # so in both branches we snapshot the keys to evict up front
+        # and then delete them in one bounded loop,
+        # rather than restarting a fresh iterator for every single eviction
+        cache = self.cache
+        sizes = self._sizes
+        maxitems = self.maxitems
+        if maxitems is not None:
+            excess = len(cache) - maxitems
+            if excess > 0:
+                for key in list(islice(cache, excess)):
+                    del cache[key]
+                    if sizes:
+                        self._bytes -= sizes.pop(key, 0)
+        maxbytes = self.maxbytes
+        if maxbytes is not None and self._bytes > maxbytes:
+            bytes_ = self._bytes
+            evicted = []
+            for key in cache:
+                if bytes_ <= maxbytes:
+                    break
+                bytes_ -= sizes.get(key, 0)
+                evicted.append(key)
+            for key in evicted:
+                del cache[key]
+                sizes.pop(key, None)
+            self._bytes = bytes_
+
+
+nlp = LRUCache()
 nlp['xx'] = load_lang('xx')
 
 # create a table of Unicode special characters for filtering
@@ -95,6 +310,14 @@ import sys
 unicode_CPS = dict.fromkeys(i for i in range(0, sys.maxunicode + 1) if unicodedata.category(chr(i)).startswith(('P', 'S', 'C')))
 
 
+# search query traffic is heavily zipfian (the same few queries repeat a lot),
+# and lemmatization is deterministic for a given input,
+# so memoizing the query path turns repeated queries into a single dict lookup;
+# full documents are not memoized because they are large and rarely repeat
+import functools
+
+
+@functools.lru_cache(maxsize=100000)
 def lemmatize_query(
         lang,
         text,
@@ -119,7 +342,11 @@ def lemmatize_query(
     #>>> lemmatize_query('en', '"Abraham Lincoln" was "president of the United States"')
     #'abraham <1> lincoln & president <2> united <1> state'
     '''
-    lemmas = lemmatize(
+    # working directly with the token list avoids the round trip
+    # of joining the lemmas into a string only to immediately split it again;
+    # individual lemmas can still contain whitespace for some languages,
+    # so each lemma is split before joining with the & operator
+    lemmas = _lemmatize_tokens(
         lang,
         text,
         lower_case=lower_case,
@@ -127,11 +354,17 @@ def lemmatize_query(
         remove_stop_words=remove_stop_words,
         add_positions=False
         )
-    return ' & '.join(lemmas.split())
+    if lemmas is None:
+        return None
+    return ' & '.join(word for lemma in lemmas for word in lemma.split())
 
 
-# this is the main function that gets called from postgresql
-def lemmatize(
+# this function implements the lemmatization logic shared by
+# lemmatize and lemmatize_query;
+# it returns the list of formatted lemmas (or None on bad input),
+# so that callers can consume the tokens directly
+# without parsing them back out of a joined string
+def _lemmatize_tokens(
         lang,
         text,
         lower_case=True,
@@ -147,12 +380,20 @@ def lemmatize(
 
     # if the language is not yet loaded, then load it
     # if the language is not supported, then use spacy's multilingual model ('xx')
-    if nlp[lang] is None:
-        if lang in valid_langs:
-            nlp[lang] = load_lang(lang)
+    model = nlp.get(lang)
+    if model is None:
+        if lang in valid_langs_set:
+            model = load_lang(lang)
         else:
             logger.warn('lang="' + lang + '" not in valid_langs, using lang="xx"')
-            nlp[lang] = nlp['xx']
+            # the 'xx' model is loaded at import time,
+            # but it can be evicted like any other entry when the cache is bounded,
+            # so we must be prepared to reload it here
+            model = nlp.get('xx')
+            if model is None:
+                model = load_lang('xx')
+                nlp['xx'] = model
+        nlp[lang] = model
 
     # process the text according to input flags
     if lower_case:
@@ -162,7 +403,7 @@ def lemmatize(
         text = text.translate(unicode_CPS)
 
     try:
-        doc = nlp[lang](text)
+        doc = model(text)
     except ValueError as e:
         # FIXME:
         # How should we handle parsing errors?
@@ -177,21 +418,6 @@ def lemmatize(
         logger.error(str(e) + ' ; lang=' + lang + ', text=' + text)
         return None
 
-    def format_token(token, i):
-        if add_positions:
-            if token.lemma_ == ' ':
-                return ' '
-            else:
-                return token.lemma_ + ':' + str(i + 1)
-        else:
-            return token.lemma_
-
-    def include_token(token):
-        if remove_stop_words:
-            return not token.is_stop
-        else:
-            return True
-
     # NOTE:
     # in the code below, we take only the first 500 characters of each token;
     # this is because the postgresql btree implementation throws an error when
@@ -201,13 +427,64 @@ def lemmatize(
     # we are guaranteed that the number of bytes will be less than 2000.
     # From a practical perspective, no real words should ever be this long,
     # so this won't effect precision/recall.
-    lemmas = [format_token(token, i)[:500] for i, token in enumerate(doc) if include_token(token)]
-    lemmas_joined = ' '.join(lemmas)
+    #
+    # previously the formatting and filtering logic lived in two helper closures
+    # that were rebuilt on every call and invoked once per token;
+    # the flags are constant for the whole document,
+    # so instead we branch on them once
+    # and each branch is a single comprehension with no per-token function calls
+    if add_positions:
+        if remove_stop_words:
+            lemmas = [' ' if token.lemma_ == ' ' else (token.lemma_ + ':' + str(i + 1))[:500] for i, token in enumerate(doc) if not token.is_stop]
+        else:
+            lemmas = [' ' if token.lemma_ == ' ' else (token.lemma_ + ':' + str(i + 1))[:500] for i, token in enumerate(doc)]
+    else:
+        if remove_stop_words:
+            lemmas = [token.lemma_[:500] for token in doc if not token.is_stop]
+        else:
+            lemmas = [token.lemma_[:500] for token in doc]
 
     # NOTE:
     # Some lemmatizers capitalize proper nouns even if the input text is lowercase.
     # That's why we need to lower case here and before doing the lemmatization.
     if lower_case and lang in ['ja', 'hr']:
-        lemmas_joined = lemmas_joined.lower()
+        lemmas = [lemma.lower() for lemma in lemmas]
 
-    return lemmas_joined
+    return lemmas
+
+
+# this is the main function that gets called from postgresql
+def lemmatize(
+        lang,
+        text,
+        lower_case=True,
+        remove_special_chars=True,
+        remove_stop_words=True,
+        add_positions=True,
+        ):
+    lemmas = _lemmatize_tokens(
+        lang,
+        text,
+        lower_case=lower_case,
+        remove_special_chars=remove_special_chars,
+        remove_stop_words=remove_stop_words,
+        add_positions=add_positions,
+        )
+    if lemmas is None:
+        return None
+    return ' '.join(lemmas)
+
+
+# the first text processed in each language pays the full model load cost,
+# which can be a noticeable stall for large language models;
+# deployments that know their languages up front can set the
+# PSPACY_PRELOAD_LANGS environment variable to a comma separated list of
+# iso codes (or to 'all') to warm those models in a background thread
+# starting at import time, so that later calls never block on a cold load
+import os
+import threading
+_preload_langs = os.environ.get('PSPACY_PRELOAD_LANGS')
+if _preload_langs:
+    _langs = None if _preload_langs == 'all' else _preload_langs.split(',')
+    # a daemon thread, so that it never prevents the process from exiting
+    threading.Thread(target=load_all_langs, args=(_langs,), daemon=True).start()
@@ -0,0 +1,207 @@
+import threading
+
+# the sys import is needed so that we can import from the current project
+import sys
+sys.path.append('.')
+import pspacy
+from pspacy import LRUCache
+
+# all test values below have the same size,
+# so the byte bounds in the maxbytes tests are easy to reason about
+VALUE = 'x' * 1000
+VALUE_SIZE = sys.getsizeof(VALUE)
+
+
+def test__unbounded_by_default():
+    cache = LRUCache()
+    for i in range(100):
+        cache[i] = i
+    assert len(cache) == 100
+
+
+def test__setitem_overwrites():
+    cache = LRUCache()
+    cache['a'] = 1
+    cache['a'] = 2
+    assert len(cache) == 1
+    assert cache['a'] == 2
+
+
+def test__evicts_least_recently_used():
+    cache = LRUCache(maxitems=2)
+    cache['a'] = 1
+    cache['b'] = 2
+    cache['c'] = 3
+    assert 'a' not in cache
+    assert 'b' in cache
+    assert 'c' in cache
+
+
+def test__getitem_updates_recency():
+    cache = LRUCache(maxitems=2)
+    cache['a'] = 1
+    cache['b'] = 2
+    cache['a']
+    cache['c'] = 3
+    assert 'a' in cache
+    assert 'b' not in cache
+
+
+def test__setitem_updates_recency():
+    cache = LRUCache(maxitems=2)
+    cache['a'] = 1
+    cache['b'] = 2
+    cache['a'] = 10
+    cache['c'] = 3
+    assert 'a' in cache
+    assert 'b' not in cache
+
+
+def test__iteration_follows_recency_order():
+    cache = LRUCache()
+    cache['a'] = 1
+    cache['b'] = 2
+    cache['c'] = 3
+    cache['a']
+    assert list(cache) == ['b', 'c', 'a']
+    assert list(cache.keys()) == ['b', 'c', 'a']
+    assert list(cache.values()) == [2, 3, 1]
+    assert list(cache.items()) == [('b', 2), ('c', 3), ('a', 1)]
+
+
+def test__eq_compares_contents():
+    cache1 = LRUCache()
+    cache2 = LRUCache()
+    cache1['a'] = 1
+    cache1['b'] = 2
+    cache2['b'] = 2
+    cache2['a'] = 1
+    assert cache1 == cache2
+    assert cache1 == {'a': 1, 'b': 2}
+    assert cache1 != {'a': 1}
+
+
+def test__get_returns_default_on_miss():
+    cache = LRUCache()
+    cache['a'] = 1
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    assert cache.get('b', 2) == 2
+
+
+def test__get_updates_recency():
+    cache = LRUCache(maxitems=2)
+    cache['a'] = 1
+    cache['b'] = 2
+    cache.get('a')
+    cache['c'] = 3
+    assert 'a' in cache
+    assert 'b' not in cache
+
+
+def test__set_maxitems_trims():
+    cache = LRUCache()
+    for i in range(10):
+        cache[i] = i
+    cache.set_maxitems(3)
+    assert len(cache) == 3
+    assert list(cache.cache) == [7, 8, 9]
+
+
+def test__update_inserts_and_trims_once():
+    cache = LRUCache(maxitems=3)
+    cache['a'] = 1
+    cache.update({'b': 2, 'c': 3, 'd': 4})
+    assert list(cache.cache) == ['b', 'c', 'd']
+
+
+def test__update_tracks_bytes():
+    cache = LRUCache(maxbytes=3 * VALUE_SIZE)
+    cache.update({i: VALUE for i in range(5)})
+    assert list(cache.cache) == [2, 3, 4]
+    cache.update({2: VALUE})
+    assert list(cache.cache) == [2, 3, 4]
+
+
+def test__maxbytes_evicts_least_recently_used():
+    cache = LRUCache(maxbytes=3 * VALUE_SIZE)
+    for i in range(4):
+        cache[i] = VALUE
+    assert list(cache.cache) == [1, 2, 3]
+
+
+def test__maxbytes_overwrite_does_not_leak_bytes():
+    cache = LRUCache(maxbytes=3 * VALUE_SIZE)
+    for i in range(100):
+        cache['a'] = VALUE
+    cache['b'] = VALUE
+    cache['c'] = VALUE
+    assert list(cache.cache) == ['a', 'b', 'c']
+
+
+def test__set_maxbytes_measures_existing_entries():
+    cache = LRUCache()
+    for i in range(10):
+        cache[i] = VALUE
+    cache.set_maxbytes(3 * VALUE_SIZE)
+    assert list(cache.cache) == [7, 8, 9]
+
+
+def test__large_shrink_keeps_newest_entries():
+    cache = LRUCache()
+    for i in range(10000):
+        cache[i] = i
+    cache.set_maxitems(100)
+    assert list(cache.cache) == list(range(9900, 10000))
+
+
+def test__maxitems_zero_keeps_cache_empty():
+    cache = LRUCache(maxitems=0)
+    cache['a'] = 1
+    assert 'a' not in cache
+    assert len(cache) == 0
+
+
+def test__cache_info_counts_hits_and_misses():
+    cache = LRUCache(maxitems=5)
+    cache['a'] = 1
+    cache['a']
+    cache.get('a')
+    cache.get('b')
+    try:
+        cache['c']
+    except KeyError:
+        pass
+    info = cache.cache_info()
+    assert info.hits == 2
+    assert info.misses == 2
+    assert info.currsize == 1
+    assert info.maxsize == 5
+
+
+def test__concurrent_access_respects_bound():
+    cache = LRUCache(maxitems=10)
+
+    def hammer(offset):
+        for i in range(1000):
+            cache[(offset + i) % 25] = i
+            cache.get(i % 25)
+
+    threads = [threading.Thread(target=hammer, args=(offset,)) for offset in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(cache) == 10
+
+
+def test__unsupported_lang_fallback_survives_eviction():
+    # a bounded model cache can evict the 'xx' fallback model,
+    # and lemmatizing an unsupported language must reload it rather than crash
+    pspacy.nlp.set_maxitems(1)
+    try:
+        pspacy.lemmatize('en', 'hello')
+        assert 'xx' not in pspacy.nlp
+        assert pspacy.lemmatize('not_a_lang', 'hello world') is not None
+    finally:
+        pspacy.nlp.set_maxitems(None)